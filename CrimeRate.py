@@ -1,151 +1,250 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns  # For grouped bar chart
-import sqlite3 as sq
+from matplotlib import colormaps
+from matplotlib.figure import Figure  # Thread-safe, pyplot-free figures rendered with Agg
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+import pyarrow as pa
+from pyarrow import csv as pacsv  # Multithreaded CSV reader
 import os
-
-def load_csv(file_path):
-    """Loads a CSV file into a pandas DataFrame."""
+from concurrent.futures import ThreadPoolExecutor
+
+# Explicit column types skip Arrow's type inference on the known columns. Year
+# columns are read as strings so reshape_data can coerce invalid cells to NaN
+# instead of the reader failing on them.
+CSV_COLUMN_TYPES = {
+    'State/UT': 'string',
+    'socio-economic factors': 'string',
+    '2019': 'string',
+    '2020': 'string',
+    '2021': 'string'
+}
+
+# Keep string columns Arrow-backed (contiguous buffers, Arrow hashing kernels)
+ARROW_TYPES_MAPPER = {pa.string(): pd.ArrowDtype(pa.string())}.get
+
+# File extensions whose backends keep text and axes as vectors
+VECTOR_FORMATS = {'.pdf', '.svg', '.eps', '.ps'}
+
+# One reusable Figure/Axes per plot, cleared between renders. Each plotter owns
+# its figure, so the two plots can still be rendered on separate threads.
+_STATE_FIG = Figure(figsize=(12, 8))
+_STATE_AX = _STATE_FIG.subplots()
+_FACTOR_FIG = Figure(figsize=(14, 8))
+_FACTOR_AX = _FACTOR_FIG.subplots()
+
+
+def iter_csv(file_path, required_columns, block_size=1 << 24):
+    """Yields a CSV file as a sequence of pandas DataFrame chunks.
+
+    The required columns are checked against the Arrow schema before any batch
+    is converted, so a malformed file fails without being parsed in full.
+    """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found at: {file_path}")
-    print(f"Loading CSV from: {file_path}")
-    return pd.read_csv(file_path)
+    print(f"Streaming CSV from: {file_path}")
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(column_types=CSV_COLUMN_TYPES)
+    )
+    with reader:
+        validate_columns(reader.schema.names, required_columns)
+        for batch in reader:
+            yield batch.to_pandas(types_mapper=ARROW_TYPES_MAPPER)
 
 
-def validate_columns(df, required_columns):
-    """Validates that required columns exist in the DataFrame."""
-    missing_columns = [col for col in required_columns if col not in df.columns]
+def validate_columns(column_names, required_columns):
+    """Validates that required columns exist among the given column names."""
+    missing_columns = set(required_columns).difference(column_names)
     if missing_columns:
-        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+        raise ValueError(f"Missing required columns: {', '.join(sorted(missing_columns))}")
     print("All required columns are present.")
 
 
 def reshape_data(df, id_column, factor_column, year_columns):
     """Reshapes a DataFrame from wide to long format."""
     print("Reshaping data from wide to long format...")
-    melted_df = pd.melt(
-        df,
-        id_vars=[id_column, factor_column],  # Include socio-economic factors
-        value_vars=year_columns,
-        var_name='Year',
-        value_name='Crime_Count'
-    )
-    # Handle missing or invalid data
-    melted_df.dropna(subset=['Crime_Count'], inplace=True)
-    melted_df['Crime_Count'] = pd.to_numeric(melted_df['Crime_Count'], errors='coerce')
-    melted_df.dropna(subset=['Crime_Count'], inplace=True)
+    # Coerce the year columns once, turning invalid cells into NaN, and flatten
+    # row-major, so each input row contributes len(year_columns) consecutive values
+    values = np.column_stack([
+        pd.to_numeric(df[col].to_numpy(dtype=object, na_value=np.nan), errors='coerce')
+        for col in year_columns
+    ]).astype(np.float64).ravel()
+    n_years = len(year_columns)
+    rows = np.repeat(np.arange(len(df)), n_years)
+    years = np.tile(np.asarray(year_columns).astype(np.int16), len(df))
+
+    # Handle missing or invalid data in a single pass, then store compact dtypes:
+    # labels taken row-wise so they keep their Arrow string dtype, and int16 years
+    mask = ~np.isnan(values)
+    rows = rows[mask]
+    counts = values[mask]
+
+    # Narrow counts to int32 only when every value is a whole number in range;
+    # otherwise keep int64, or float64 for fractional counts
+    if np.array_equal(counts, np.trunc(counts)):
+        int32_info = np.iinfo(np.int32)
+        fits_int32 = counts.size == 0 or (
+            counts.min() >= int32_info.min and counts.max() <= int32_info.max
+        )
+        counts = counts.astype(np.int32 if fits_int32 else np.int64)
+
+    melted_df = pd.DataFrame({
+        id_column: df[id_column].array.take(rows),
+        factor_column: df[factor_column].array.take(rows),
+        'Year': years[mask],
+        'Crime_Count': counts
+    })
     print(f"Reshaped DataFrame:\n{melted_df.head()}")
     return melted_df
 
 
-def save_to_sqlite(df, db_name, table_name):
-    """Saves a pandas DataFrame to an SQLite database."""
-    print(f"Saving data to SQLite database: {db_name}, table: {table_name}")
-    conn = sq.connect(db_name)
-    df.to_sql(table_name, conn, if_exists="replace", index=False)
-    return conn
-
-
-def fetch_data_by_state(conn, table_name):
-    """Fetches data grouped by state and year."""
-    query = f"""
-        SELECT "State/UT" AS State, Year, SUM(Crime_Count) AS Crime_Count
-        FROM {table_name}
-        GROUP BY "State/UT", Year
-        ORDER BY "State/UT", Year;
-    """
-    print("Executing SQL query to fetch data by state...")
-    return pd.read_sql_query(query, conn)
-
-
-def fetch_data_by_factors(conn, table_name):
-    """Fetches data grouped by state, socio-economic factors, and year."""
-    query = f"""
-        SELECT "State/UT" AS State, "socio-economic factors" AS Factor, Year, 
-               SUM(Crime_Count) AS Crime_Count
-        FROM {table_name}
-        GROUP BY "State/UT", "socio-economic factors", Year
-        ORDER BY "State/UT", "socio-economic factors", Year;
-    """
-    print("Executing SQL query to fetch data by socio-economic factors...")
-    return pd.read_sql_query(query, conn)
+def aggregate_crimes(df, group_columns, value_column='Crime_Count'):
+    """Sums crime counts over the given grouping columns."""
+    return (
+        df.groupby(group_columns, observed=True, sort=False)[value_column]
+        .sum()
+        .reset_index()
+    )
 
 
-def plot_data_by_state(data, state_column, year_column, value_column):
-    """Plots a line graph of crime trends by state."""
+def plot_data_by_state(data, state_column, year_column, value_column, output_path):
+    """Plots a line graph of crime trends by state and saves it to a PNG file."""
     print("Plotting line graph for crime trends by state...")
-    states = data[state_column].unique()
-    plt.figure(figsize=(12, 8))
-    
-    for state in states:
-        state_data = data[data[state_column] == state]
-        plt.plot(
-            state_data[year_column],
-            state_data[value_column],
-            marker='o',
-            linestyle='-',
-            label=state
-        )
-
-    plt.title('Crime Trends by State Over the Years', fontsize=14, fontweight='bold')
-    plt.xlabel('Year', fontsize=12)
-    plt.ylabel('Number of Crimes', fontsize=12)
-    plt.xticks(rotation=45)
-    plt.legend(loc='upper left', bbox_to_anchor=(1, 1), title='States')
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.tight_layout()
-    plt.show()
-
+    fig, ax = _STATE_FIG, _STATE_AX
+    ax.clear()
+
+    # Sort by state and year so each line runs chronologically and the legend
+    # order does not depend on the order rows first appeared in the file
+    data = data.sort_values([state_column, year_column])
+
+    # A single groupby pass partitions the frame; no per-state boolean masks.
+    # States with fewer than two points cannot form a line and are skipped.
+    states, segments = [], []
+    for state, g in data.groupby(state_column, sort=False, observed=True):
+        if len(g) < 2:
+            continue
+        states.append(state)
+        segments.append(np.column_stack([
+            g[year_column].to_numpy(dtype=np.float64),
+            g[value_column].to_numpy(dtype=np.float64)
+        ]))
+    if not segments:
+        print("No state has enough data points to plot a trend line.")
+        return
+
+    # Draw every state's trend as one LineCollection instead of one Line2D per state
+    colors = colormaps['tab20'](np.linspace(0, 1, len(segments)))
+    ax.add_collection(
+        LineCollection(segments, colors=colors, linestyle='-', rasterized=True)
+    )
 
-def plot_bar_data_by_factors(data, factor_column, state_column, year_column, value_column):
-    """Plots a grouped bar graph based on socio-economic factors."""
+    # One scatter call for the point markers of all states
+    points = np.concatenate(segments)
+    point_colors = np.repeat(colors, [len(s) for s in segments], axis=0)
+    ax.scatter(points[:, 0], points[:, 1], c=point_colors, marker='o', rasterized=True)
+    ax.autoscale_view()
+
+    handles = [
+        Line2D([], [], color=color, marker='o', linestyle='-', label=state)
+        for state, color in zip(states, colors)
+    ]
+    years = np.unique(points[:, 0])
+    ax.set_xticks(years)
+    ax.set_xticklabels([f"{year:g}" for year in years], rotation=45)
+
+    ax.set_title('Crime Trends by State Over the Years', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Number of Crimes', fontsize=12)
+    ax.legend(handles=handles, loc='upper left', bbox_to_anchor=(1, 1), title='States')
+    ax.grid(True, linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    # In vector formats the rasterized line layer is embedded at the savefig dpi,
+    # so a low dpi keeps it small; raster formats keep the default resolution
+    if os.path.splitext(output_path)[1].lower() in VECTOR_FORMATS:
+        fig.savefig(output_path, dpi=72)
+    else:
+        fig.savefig(output_path)
+    print(f"Saved line graph to: {output_path}")
+
+
+def plot_bar_data_by_factors(data, factor_column, state_column, year_column, value_column,
+                             output_path):
+    """Plots a grouped bar graph based on socio-economic factors and saves it to a PNG file."""
     print("Plotting grouped bar graph based on socio-economic factors...")
-    plt.figure(figsize=(14, 8))
-    sns.barplot(
-        data=data,
-        x=state_column,
-        y=factor_column,
-        hue=factor_column,
-        ci=None
+    fig, ax = _FACTOR_FIG, _FACTOR_AX
+    ax.clear()
+
+    # Data is already summed, so pivot it and draw one bar series per factor.
+    # Sorting first keeps the bar and legend order deterministic.
+    data = data.sort_values([state_column, factor_column])
+    pivot = data.pivot_table(
+        index=state_column,
+        columns=factor_column,
+        values=value_column,
+        aggfunc='sum',
+        observed=True,
+        sort=False
     )
-    plt.title('Crime Counts by Socio-Economic Factors and State', fontsize=14, fontweight='bold')
-    plt.xlabel('Year', fontsize=12)
-    plt.ylabel('Number of Crimes', fontsize=12)
-    plt.xticks(rotation=45)
-    plt.legend(title="Socio-Economic Factors", bbox_to_anchor=(1, 1))
-    plt.tight_layout()
-    plt.show()
+    x = np.arange(len(pivot))
+    width = 0.8 / len(pivot.columns)
+    for i, factor in enumerate(pivot.columns):
+        ax.bar(x + i * width, pivot[factor].to_numpy(), width, label=factor)
+
+    ax.set_title('Crime Counts by Socio-Economic Factors and State', fontsize=14, fontweight='bold')
+    ax.set_xlabel('State', fontsize=12)
+    ax.set_ylabel('Number of Crimes', fontsize=12)
+    ax.set_xticks(x + (len(pivot.columns) - 1) * width / 2)
+    ax.set_xticklabels(pivot.index, rotation=45, ha='right')
+    ax.legend(title="Socio-Economic Factors", bbox_to_anchor=(1, 1))
+    fig.tight_layout()
+    fig.savefig(output_path)
+    print(f"Saved grouped bar graph to: {output_path}")
 
 
 def main():
     # Configuration
     csv_path = r"C:\Users\khanm\Documents\PythonProjectCrimeRateAnalysis\en.csv"
-    db_name = ":memory:"  # Use ":memory:" for an in-memory database
-    table_name = "crimes_table"
     id_column = "State/UT"
     factor_column = "socio-economic factors"
     year_columns = ['2019', '2020', '2021']
+    state_plot_path = "crime_trends_by_state.png"
+    factor_plot_path = "crime_counts_by_factors.png"
 
-    try:
-        # Load and preprocess data
-        df = load_csv(csv_path)
-        validate_columns(df, [id_column, factor_column] + year_columns)
-        reshaped_df = reshape_data(df, id_column, factor_column, year_columns)
-
-        # Save to SQLite and query
-        conn = save_to_sqlite(reshaped_df, db_name, table_name)
+    factor_columns = [id_column, factor_column, 'Year']
 
-        # Fetch and plot data by state
-        state_data = fetch_data_by_state(conn, table_name)
-        if not state_data.empty:
-            plot_data_by_state(state_data, "State", "Year", "Crime_Count")
-
-        # Fetch and plot data by socio-economic factors
-        factor_data = fetch_data_by_factors(conn, table_name)
-        if not factor_data.empty:
-            plot_bar_data_by_factors(factor_data, "Factor", "State", "Year", "Crime_Count")
+    try:
+        # Load, preprocess and partially aggregate data chunk by chunk
+        factor_parts = []
+        for df in iter_csv(csv_path, [id_column, factor_column] + year_columns):
+            reshaped_df = reshape_data(df, id_column, factor_column, year_columns)
+            factor_parts.append(aggregate_crimes(reshaped_df, factor_columns))
+
+        # Aggregate the raw rows once at the finest grain, then roll the
+        # small result up to state level
+        print("Aggregating crime counts by state and socio-economic factors...")
+        factor_data = aggregate_crimes(
+            pd.concat(factor_parts, ignore_index=True), factor_columns
+        ).rename(columns={id_column: "State", factor_column: "Factor"})
+        state_data = aggregate_crimes(factor_data, ["State", "Year"])
+
+        # Render both plots concurrently; each plotter uses its own Figure
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = []
+            if not state_data.empty:
+                futures.append(executor.submit(
+                    plot_data_by_state,
+                    state_data, "State", "Year", "Crime_Count", state_plot_path
+                ))
+            if not factor_data.empty:
+                futures.append(executor.submit(
+                    plot_bar_data_by_factors,
+                    factor_data, "Factor", "State", "Year", "Crime_Count", factor_plot_path
+                ))
+            for future in futures:
+                future.result()
 
-        conn.close()
         print("Process completed successfully.")
 
     except Exception as e: